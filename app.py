@@ -1,7 +1,10 @@
+import io
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
 import numpy as np
+import pyarrow as pa
 from datetime import datetime
 import plotly.io as pio
 
@@ -17,60 +20,183 @@ st.set_page_config(
 )
 
 # Sample Data Generator (with proper date handling)
+@st.cache_data(ttl="24h", max_entries=4, persist="disk")
+def fetch_vehicle_data():
+    """Generate realistic sample data (cached across reruns)"""
+    rng = np.random.default_rng(42)
+    date_rng = pd.date_range('2022-01-01', '2023-12-31', freq='D')
+    categories = np.array(['2W', '3W', '4W'])
+    manufacturers = np.array(['Tata', 'Mahindra', 'Maruti', 'Hyundai', 'Kia', 'Toyota', 'Honda'])
+
+    # Sample integer indices only; the drawn codes become the categorical
+    # columns directly via from_codes, so no string array is ever gathered
+    # and re-encoded
+    n = 1000
+    data = pd.DataFrame({
+        'date': date_rng.values[rng.integers(0, len(date_rng), n)],
+        'vehicle_category': pd.Categorical.from_codes(
+            rng.choice(len(categories), n, p=[0.6, 0.1, 0.3]), categories=categories),
+        'manufacturer': pd.Categorical.from_codes(
+            rng.integers(0, len(manufacturers), n), categories=manufacturers),
+        # int32 halves the bandwidth of the most-summed column
+        'registrations': rng.integers(1, 100, n, dtype=np.int32)
+    })
+
+    # Ensure proper datetime type
+    data['date'] = pd.to_datetime(data['date'])
+
+    # Pre-sorted by date so range filters can binary-search the column
+    return data.sort_values('date', ignore_index=True)
+
+
 class VahanDataCollector:
     def fetch_vehicle_data(self):
-        """Generate realistic sample data"""
-        np.random.seed(42)
-        date_rng = pd.date_range('2022-01-01', '2023-12-31', freq='D')
-        categories = ['2W', '3W', '4W']
-        manufacturers = ['Tata', 'Mahindra', 'Maruti', 'Hyundai', 'Kia', 'Toyota', 'Honda']
-        
-        data = pd.DataFrame({
-            'date': np.random.choice(date_rng, 1000),
-            'vehicle_category': np.random.choice(categories, 1000, p=[0.6, 0.1, 0.3]),
-            'manufacturer': np.random.choice(manufacturers, 1000),
-            'registrations': np.random.randint(1, 100, 1000)
-        })
-        
-        # Ensure proper datetime type
-        data['date'] = pd.to_datetime(data['date'])
-        return data
+        """Fetch the (cached) sample dataset"""
+        return fetch_vehicle_data()
 
 # Data Processor (with fixed warnings)
+@st.cache_data(
+    max_entries=32,
+    show_spinner=False,
+    persist="disk",
+    hash_funcs={
+        pd.DataFrame: lambda df: (
+            len(df),
+            tuple(df.columns),
+            pd.util.hash_pandas_object(df, index=False).sum(),
+        )
+    },
+)
+def _process_for_analytics(df):
+    """Process raw data for dashboard analytics (cached per frame contents).
+
+    A single (month, category, manufacturer) groupby builds the cube;
+    every published aggregate is derived by summing over its slices, so
+    the raw frame is scanned exactly once.
+    """
+    cube = build_registration_cube(df)
+    return _analytics_from_cube(cube, (), None, None)
+
+
 class DataProcessor:
     def process_for_analytics(self, df):
         """Process raw data for dashboard analytics"""
-        results = {}
-        
-        # Create a copy to avoid SettingWithCopyWarning
-        df = df.copy()
-        
-        # Total registrations
-        results['total_registrations'] = df['registrations'].sum()
-        
-        # Monthly trend data - using 'ME' instead of deprecated 'M'
-        monthly = df.groupby(pd.Grouper(key='date', freq='ME')).agg({'registrations': 'sum'}).reset_index()
-        monthly['month'] = monthly['date'].dt.strftime('%Y-%m')
-        results['monthly_trend'] = monthly
-        
-        # Category distribution - ensure column names match what Plotly expects
-        category_dist = df.groupby('vehicle_category')['registrations'].sum().reset_index()
-        category_dist = category_dist.rename(columns={'vehicle_category': 'category'})
-        results['category_distribution'] = category_dist
-        
-        # Growth calculations
-        if len(df['date'].dt.year.unique()) > 1:
-            current_year = df[df['date'].dt.year == df['date'].dt.year.max()]['registrations'].sum()
-            last_year = df[df['date'].dt.year == df['date'].dt.year.max() - 1]['registrations'].sum()
-            results['total_yoy_growth'] = ((current_year - last_year) / last_year) * 100 if last_year != 0 else 0
-        else:
-            results['total_yoy_growth'] = 0
-        
-        # Manufacturer analysis
-        manufacturer_stats = df.groupby('manufacturer')['registrations'].sum().sort_values(ascending=False).reset_index()
-        results['top_manufacturers'] = manufacturer_stats
-        
-        return results
+        return _process_for_analytics(df)
+
+
+@st.cache_data
+def build_registration_cube(df):
+    """Pre-aggregate registrations per (month, category, manufacturer).
+
+    Built once per raw dataset; filter changes then sum slices of this
+    tiny cube instead of re-scanning the raw frame.
+    """
+    cube = (
+        df.groupby(
+            [pd.Grouper(key='date', freq='ME'), 'vehicle_category', 'manufacturer'],
+            observed=True
+        )['registrations']
+        .sum()
+        .reset_index()
+    )
+    return cube
+
+
+def _group_yoy(sliced, key):
+    """Vectorized YoY growth per group.
+
+    One C-level groupby over (key, year) unstacked to a year matrix, then
+    a single arithmetic pass - no per-group Python loop over unique().
+    """
+    g = (
+        sliced.groupby([key, sliced['date'].dt.year.rename('year')], observed=True)['registrations']
+        .sum()
+        .unstack('year')
+        .fillna(0)
+    )
+    if g.shape[1] < 2:
+        return pd.DataFrame({key: g.index, 'yoy_growth': 0.0}).reset_index(drop=True)
+    latest, prev = g.iloc[:, -1], g.iloc[:, -2]
+    yoy = ((latest - prev) / prev.replace(0, np.nan) * 100).fillna(0)
+    return yoy.rename('yoy_growth').reset_index()
+
+
+def _is_month_aligned(date_range):
+    """True when the range covers whole months, so the monthly cube is exact."""
+    if len(date_range) != 2:
+        return True
+    start, end = pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1])
+    return start.day == 1 and end.is_month_end
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def _analytics_from_cube(cube, date_range, categories, manufacturers):
+    """Compute the dashboard analytics dict from the pre-aggregated cube.
+
+    Cached on (cube contents, filter selections): re-selecting a filter
+    combination the user already visited is a dict lookup.
+    """
+    mask = pd.Series(True, index=cube.index)
+    if len(date_range) == 2:
+        start, end = (pd.Timestamp(d).to_period('M') for d in date_range)
+        periods = cube['date'].dt.to_period('M')
+        mask &= (periods >= start) & (periods <= end)
+    if categories is not None:
+        mask &= cube['vehicle_category'].isin(categories)
+    if manufacturers is not None:
+        mask &= cube['manufacturer'].isin(manufacturers)
+
+    sliced = cube.loc[mask]
+
+    results = {}
+    results['total_registrations'] = sliced['registrations'].sum()
+
+    # Keep the month as datetime64; Plotly formats datetime axes
+    # natively, so no per-row strftime string is ever materialized
+    monthly = sliced.groupby('date', as_index=False)['registrations'].sum()
+    results['monthly_trend'] = monthly
+
+    category_dist = sliced.groupby('vehicle_category', observed=True)['registrations'].sum().reset_index()
+    category_dist = category_dist.rename(columns={'vehicle_category': 'category'})
+    results['category_distribution'] = category_dist
+
+    yearly = sliced.groupby(sliced['date'].dt.year)['registrations'].sum()
+    if len(yearly) > 1:
+        current_year, last_year = yearly.iloc[-1], yearly.iloc[-2]
+        results['total_yoy_growth'] = ((current_year - last_year) / last_year) * 100 if last_year != 0 else 0
+    else:
+        results['total_yoy_growth'] = 0
+
+    results['category_yoy_growth'] = _group_yoy(sliced, 'vehicle_category')
+    results['manufacturer_yoy_growth'] = _group_yoy(sliced, 'manufacturer')
+
+    mfr_totals = sliced.groupby('manufacturer', observed=True)['registrations'].sum()
+    # Partial heap-select of the ten rows the chart shows, instead of a
+    # full O(M log M) sort of every manufacturer
+    manufacturer_stats = mfr_totals.nlargest(10).reset_index()
+    results['top_manufacturers'] = manufacturer_stats
+
+    if len(mfr_totals) > 0:
+        # The KPI card needs only the single leader: one O(M) max scan
+        results['leader_name'] = mfr_totals.idxmax()
+        results['leader_count'] = int(mfr_totals.max())
+    else:
+        results['leader_name'] = "N/A"
+        results['leader_count'] = 0
+
+    # Pre-convert the display table to Arrow once; st.dataframe then skips
+    # the per-rerun pandas-to-Arrow serialization
+    results['top_manufacturers_arrow'] = pa.Table.from_pandas(
+        manufacturer_stats.head(10), preserve_index=False
+    )
+
+    return results
+
+# Cached singleton - reuse one instance across reruns instead of
+# reconstructing per interaction
+@st.cache_resource
+def get_processor():
+    return DataProcessor()
 
 # Utility functions
 def format_number(num):
@@ -90,36 +216,75 @@ def initialize_session_state():
 
 def load_data():
     """Load and process data"""
-    data_collector = VahanDataCollector()
-    data_processor = DataProcessor()
-    
+    data_processor = get_processor()
+
     with st.spinner("Fetching latest data..."):
         try:
-            raw_data = data_collector.fetch_vehicle_data()
+            raw_data = fetch_vehicle_data()
             processed_data = data_processor.process_for_analytics(raw_data)
             
             st.session_state.vehicle_data = raw_data
             st.session_state.processed_data = processed_data
             st.session_state.data_loaded = True
             st.session_state.last_refresh = datetime.now()
+            # New data invalidates the filter signature, otherwise the
+            # fragment would keep these unfiltered analytics on the next
+            # rerun even though filters are still selected
+            st.session_state.pop('last_filter_sig', None)
             return True
         except Exception as e:
             st.error(f"Error loading data: {str(e)}")
             st.session_state.data_loaded = False
             return False
 
+def _unique_options(col):
+    """Sorted uniques; categorical columns expose them without a scan."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        return sorted(col.cat.categories.tolist())
+    return sorted(col.unique().tolist())
+
+@st.cache_data
+def get_filter_options(df):
+    """Precompute widget option lists from the raw data (cached)"""
+    return {
+        'categories': _unique_options(df['vehicle_category']),
+        'manufacturers': _unique_options(df['manufacturer']),
+        'min_date': df['date'].min().to_pydatetime(),
+        'max_date': df['date'].max().to_pydatetime()
+    }
+
+def _isin_codes(col, selected):
+    """isin over categorical integer codes instead of hashed strings."""
+    if isinstance(col.dtype, pd.CategoricalDtype):
+        codes = col.cat.categories.get_indexer(selected)
+        return col.cat.codes.isin(set(codes[codes >= 0]))
+    return col.isin(selected)
+
 def create_filters(df):
-    """Create interactive filters"""
+    """Create interactive filters.
+
+    Returns the filtered frame plus a hashable signature of the current
+    widget selections, so callers can detect filter changes without
+    comparing DataFrames element-wise.
+    """
     st.sidebar.subheader("🔍 Data Filters")
-    
-    # Create copy to avoid modifying original
-    df = df.copy()
-    
+
+    # No defensive copy: this function only reads df and reassigns the
+    # name to a filtered slice, so the caller's frame is never mutated
+    # None marks a no-op filter ("all selected"); a list - including an
+    # empty one - is a proper subset that must be applied
+    date_range = ()
+    categories = None
+    manufacturers = None
+    masks = []
+
+    options = get_filter_options(df)
+
     # Date range filter
     if 'date' in df.columns:
-        min_date = df['date'].min().to_pydatetime()
-        max_date = df['date'].max().to_pydatetime()
-        
+        min_date = options['min_date']
+        max_date = options['max_date']
+
         date_range = st.sidebar.date_input(
             "Select Date Range",
             value=(min_date, max_date),
@@ -129,28 +294,56 @@ def create_filters(df):
         
         if len(date_range) == 2:
             start_date, end_date = date_range
-            df = df[(df['date'] >= pd.to_datetime(start_date)) & 
-                   (df['date'] <= pd.to_datetime(end_date))]
-    
+            start_ts = pd.Timestamp(start_date)
+            end_ts = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+            if df['date'].is_monotonic_increasing:
+                # The data is pre-sorted by date, so the range becomes an
+                # O(log N) binary search and a view-like slice - no
+                # boolean mask allocated for the date predicate
+                lo, hi = df['date'].values.searchsorted(
+                    [start_ts.to_datetime64(), end_ts.to_datetime64()]
+                )
+                df = df.iloc[lo:hi]
+            else:
+                masks.append(df['date'].between(start_ts, pd.Timestamp(end_date)))
+
     # Vehicle category filter
     if 'vehicle_category' in df.columns:
         categories = st.sidebar.multiselect(
             "Vehicle Categories",
-            options=sorted(df['vehicle_category'].unique().tolist()),
-            default=df['vehicle_category'].unique().tolist()
+            options=options['categories'],
+            default=options['categories']
         )
-        df = df[df['vehicle_category'].isin(categories)]
-    
+        # Everything selected means the predicate is a no-op; any proper
+        # subset - even the empty selection - is applied, so clearing all
+        # options yields an empty dashboard, not an unfiltered one
+        if len(categories) == len(options['categories']):
+            categories = None
+        else:
+            masks.append(_isin_codes(df['vehicle_category'], categories))
+
     # Manufacturer filter
     if 'manufacturer' in df.columns:
         manufacturers = st.sidebar.multiselect(
             "Manufacturers",
-            options=sorted(df['manufacturer'].unique().tolist()),
-            default=df['manufacturer'].unique().tolist()[:3]
+            options=options['manufacturers'],
+            default=options['manufacturers'][:3]
         )
-        df = df[df['manufacturer'].isin(manufacturers)]
-    
-    return df
+        if len(manufacturers) == len(options['manufacturers']):
+            manufacturers = None
+        else:
+            masks.append(_isin_codes(df['manufacturer'], manufacturers))
+
+    # Apply all predicates in a single boolean-index pass
+    if masks:
+        df = df.loc[np.logical_and.reduce(masks)]
+
+    filter_sig = (
+        tuple(date_range),
+        None if categories is None else tuple(sorted(categories)),
+        None if manufacturers is None else tuple(sorted(manufacturers)),
+    )
+    return df, filter_sig
 
 def display_kpi_metrics(processed_data):
     """Display key performance indicators"""
@@ -176,82 +369,176 @@ def display_kpi_metrics(processed_data):
         )
     
     with cols[2]:
-        top_mfg = processed_data.get('top_manufacturers', pd.DataFrame())
-        leader = top_mfg.iloc[0]['manufacturer'] if len(top_mfg) > 0 else "N/A"
         st.metric(
             "Market Leader",
-            leader
+            processed_data.get('leader_name', "N/A")
         )
-    
+
     with cols[3]:
-        if len(top_mfg) > 0 and 'total_registrations' in processed_data:
+        leader_count = processed_data.get('leader_count', 0)
+        if leader_count and 'total_registrations' in processed_data:
             total = processed_data['total_registrations']
-            leader_count = top_mfg.iloc[0]['registrations']
             share = (leader_count / total) * 100 if total else 0
             st.metric(
                 "Market Share",
                 f"{share:.1f}%"
             )
 
+MAX_TREND_POINTS = 2000
+
+def downsample_trend(df, max_points=MAX_TREND_POINTS):
+    """Cap the number of trend points shipped to the browser.
+
+    Monthly data stays untouched; if the trend ever becomes daily (or
+    finer), uniform binning keeps the payload and render cost bounded.
+    """
+    if len(df) <= max_points:
+        return df
+    bins = np.linspace(0, len(df), max_points + 1).astype(int)
+    idx = np.arange(len(df))
+    return df.groupby(np.digitize(idx, bins[1:-1]), as_index=False).agg(
+        {'date': 'first', 'registrations': 'sum'}
+    )
+
+# Figure factories - built once per session from plain arrays; reruns
+# mutate the existing traces in place instead of paying figure
+# construction + validation again. graph_objects takes the arrays
+# directly, skipping the internal DataFrame px builds per call
+def build_monthly_line(x, y):
+    fig = go.Figure(go.Scattergl(x=x, y=y, mode='lines'))  # GPU-backed trace
+    fig.update_layout(
+        title="Monthly Registration Trends",
+        yaxis_title='Number of Registrations',
+        hovermode="x unified"
+    )
+    return fig
+
+def build_category_pie(labels, values):
+    fig = go.Figure(go.Pie(labels=labels, values=values, hole=0.3))
+    fig.update_layout(title="Vehicle Category Distribution")
+    return fig
+
+def build_manufacturer_bar(x, y):
+    fig = go.Figure(go.Bar(x=x, y=y, orientation='h'))
+    fig.update_layout(
+        title="Top 10 Manufacturers by Registrations",
+        xaxis_title='Number of Registrations'
+    )
+    return fig
+
 def create_trend_charts(processed_data):
     """Create registration trend and distribution charts"""
     col1, col2 = st.columns(2)
-    
+
     with col1:
         st.subheader("📈 Registration Trends")
         if 'monthly_trend' in processed_data:
-            fig = px.line(
-                processed_data['monthly_trend'],
-                x='month',
-                y='registrations',
-                title="Monthly Registration Trends",
-                labels={'registrations': 'Number of Registrations'}
-            )
-            fig.update_layout(hovermode="x unified")
-            st.plotly_chart(fig, use_container_width=True)
+            monthly = downsample_trend(processed_data['monthly_trend'])
+            x = monthly['date'].to_numpy()
+            y = monthly['registrations'].to_numpy()
+            if 'fig_monthly' not in st.session_state:
+                st.session_state.fig_monthly = build_monthly_line(x, y)
+            else:
+                st.session_state.fig_monthly.data[0].x = x
+                st.session_state.fig_monthly.data[0].y = y
+            # Stable key lets Streamlit diff the existing chart in place
+            # (Plotly.react) instead of tearing down and rebuilding the DOM
+            st.plotly_chart(st.session_state.fig_monthly,
+                            use_container_width=True, key='chart_monthly_trend')
         else:
             st.warning("Monthly trend data not available")
-    
+
     with col2:
         st.subheader("🏭 Category Distribution")
         if 'category_distribution' in processed_data:
-            fig = px.pie(
-                processed_data['category_distribution'],
-                values='registrations',
-                names='category',  # This now matches the renamed column
-                title="Vehicle Category Distribution",
-                hole=0.3
-            )
-            st.plotly_chart(fig, use_container_width=True)
+            cat_data = processed_data['category_distribution']
+            labels = cat_data['category'].to_numpy()
+            values = cat_data['registrations'].to_numpy()
+            if 'fig_category' not in st.session_state:
+                st.session_state.fig_category = build_category_pie(labels, values)
+            else:
+                st.session_state.fig_category.update_traces(labels=labels, values=values)
+            st.plotly_chart(st.session_state.fig_category,
+                            use_container_width=True, key='chart_category_dist')
         else:
             st.warning("Category distribution data not available")
 
 def create_manufacturer_analysis(processed_data):
     """Create manufacturer performance charts"""
     st.subheader("🏢 Manufacturer Performance")
-    
+
     if 'top_manufacturers' in processed_data:
         col1, col2 = st.columns(2)
-        
+
         with col1:
-            fig = px.bar(
-                processed_data['top_manufacturers'].head(10),
-                x='registrations',
-                y='manufacturer',
-                orientation='h',
-                title="Top 10 Manufacturers by Registrations",
-                labels={'registrations': 'Number of Registrations'}
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        
+            top10 = processed_data['top_manufacturers'].head(10)
+            bar_x = top10['registrations'].to_numpy()
+            bar_y = top10['manufacturer'].to_numpy()
+            if 'fig_manufacturer' not in st.session_state:
+                st.session_state.fig_manufacturer = build_manufacturer_bar(bar_x, bar_y)
+            else:
+                st.session_state.fig_manufacturer.data[0].x = bar_x
+                st.session_state.fig_manufacturer.data[0].y = bar_y
+            st.plotly_chart(st.session_state.fig_manufacturer,
+                            use_container_width=True, key='chart_top_manufacturers')
+
         with col2:
             # Additional manufacturer analysis can go here
             st.write("Manufacturer Performance Metrics")
             st.dataframe(
-                processed_data['top_manufacturers'].head(10),
+                processed_data.get(
+                    'top_manufacturers_arrow',
+                    processed_data['top_manufacturers'].head(10)
+                ),
                 use_container_width=True
             )
 
+@st.fragment
+def render_dashboard(raw_df):
+    """Filter, process and render the dashboard body.
+
+    Decorated with st.fragment so filter interactions rerun only this
+    function instead of the whole script.
+    """
+    # Apply filters
+    filtered_df, filter_sig = create_filters(raw_df)
+
+    # Re-process data only when the filter selections actually changed;
+    # analytics sum slices of the pre-aggregated cube, never the raw rows
+    if st.session_state.get('last_filter_sig') != filter_sig:
+        date_range, categories, manufacturers = filter_sig
+        if _is_month_aligned(date_range):
+            cube = build_registration_cube(raw_df)
+            st.session_state.processed_data = _analytics_from_cube(
+                cube, date_range,
+                None if categories is None else list(categories),
+                None if manufacturers is None else list(manufacturers),
+            )
+        else:
+            # Partial boundary months: the month-grained cube would count
+            # whole months, so aggregate the day-filtered rows exactly
+            # (still content-cached per filtered frame)
+            st.session_state.processed_data = _process_for_analytics(filtered_df)
+        st.session_state.last_filter_sig = filter_sig
+
+    # Display dashboard
+    display_kpi_metrics(st.session_state.processed_data)
+    st.markdown("---")
+    create_trend_charts(st.session_state.processed_data)
+    st.markdown("---")
+    create_manufacturer_analysis(st.session_state.processed_data)
+
+    # Export: gzip straight into a bytes buffer rather than materializing
+    # the whole CSV as a Python string first
+    buf = io.BytesIO()
+    filtered_df.to_csv(buf, index=False, compression='gzip')
+    st.sidebar.download_button(
+        "⬇️ Download Filtered Data",
+        data=buf.getvalue(),
+        file_name=f"vehicle_data_{datetime.now():%Y%m%d}.csv.gz",
+        mime="application/gzip"
+    )
+
 def main():
     initialize_session_state()
     
@@ -264,31 +551,20 @@ def main():
     with st.sidebar:
         st.header("Dashboard Controls")
         if st.button("🔄 Refresh Data", type="primary"):
+            # Drop the cached frame so the refresh actually refetches
+            fetch_vehicle_data.clear()
             if load_data():
                 st.rerun()
     
-    # Load data if not loaded
+    # Load data if not loaded - fetch_vehicle_data is cached, so this is
+    # cheap and needs no st.rerun() round-trip on first page load
     if not st.session_state.data_loaded:
-        if load_data():
-            st.rerun()
-        else:
+        if not load_data():
             st.error("Failed to load data. Using sample dataset.")
             return
     
-    # Apply filters
-    filtered_df = create_filters(st.session_state.vehicle_data.copy())
-    
-    # Re-process data if filters changed
-    if not filtered_df.equals(st.session_state.vehicle_data):
-        processor = DataProcessor()
-        st.session_state.processed_data = processor.process_for_analytics(filtered_df)
-    
-    # Display dashboard
-    display_kpi_metrics(st.session_state.processed_data)
-    st.markdown("---")
-    create_trend_charts(st.session_state.processed_data)
-    st.markdown("---")
-    create_manufacturer_analysis(st.session_state.processed_data)
+    # Filter + render inside a fragment so interactions stay scoped
+    render_dashboard(st.session_state.vehicle_data)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,12 +1,125 @@
 import requests
 import pandas as pd
 import trafilatura
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from functools import lru_cache
+import logging
+
+from dateutil.parser import parse as _dateutil_parse
 import json
 import re
+import threading
 import time
 from typing import Dict, List, Optional
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+logger = logging.getLogger(__name__)
+
+
+# Single compiled alternation for scraped-content parsing: one DFA walk
+# over the page instead of five re.findall calls per line
+_SCRAPE_PATTERN = re.compile(
+    r"(?P<count>\d+)\s*(?:vehicles?|registrations?)"
+    r"|(?P<manufacturer>Maruti|Honda|Hyundai|Tata|Mahindra|Toyota|Ford|Suzuki|Hero|Bajaj|TVS|Yamaha)"
+    r"|(?P<category>2W|3W|4W|Two Wheeler|Three Wheeler|Four Wheeler|Car|Bike|Motorcycle)"
+    r"|(?P<date>\d{1,2}[-/]\d{1,2}[-/]\d{2,4})"
+    r"|(?P<month_year>(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s*\d{4})",
+    re.IGNORECASE
+)
+
+
+# One precompiled pattern per bucket, in the priority order the original
+# if/elif ladder checked them - a string matching several buckets (e.g.
+# 'PASSENGER AUTO') must resolve by bucket priority, not match position
+_CAT_PATTERNS = (
+    ('2W', re.compile(r'2W|TWO WHEEL|BIKE|MOTORCYCLE|SCOOTER')),
+    ('3W', re.compile(r'3W|THREE WHEEL|AUTO|RICKSHAW')),
+    ('4W', re.compile(r'4W|FOUR WHEEL|CAR|PASSENGER')),
+)
+
+
+def standardize_category_series(s: pd.Series) -> pd.Series:
+    """Map a raw category column onto 2W/3W/4W, one C-level pass per bucket."""
+    upper = s.astype(str).str.upper()
+    out = upper.str.strip()
+    # Applied lowest priority first so higher buckets overwrite on ties
+    for bucket, pattern in reversed(_CAT_PATTERNS):
+        out = out.mask(upper.str.contains(pattern, na=False), bucket)
+    return out
+
+
+# Outbound guardrails per provider: requests per second and maximum
+# number of items allowed in one batch call
+PROVIDER_LIMITS: Dict[str, Dict[str, int]] = {
+    'default': {'rps': 5, 'max_batch': 100},
+}
+
+
+class RateLimiter:
+    """Sliding-window rate limiter: at most `calls` per `period` seconds."""
+
+    def __init__(self, calls: int = 5, period: float = 1.0):
+        self.calls = calls
+        self.period = period
+        self._timestamps = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        # Serialized: concurrent executor workers must not all pass the
+        # length check at once and burst past the configured rate
+        with self._lock:
+            now = time.monotonic()
+            while self._timestamps and now - self._timestamps[0] > self.period:
+                self._timestamps.popleft()
+            if len(self._timestamps) >= self.calls:
+                sleep_for = self.period - (now - self._timestamps[0])
+                if sleep_for > 0:
+                    time.sleep(sleep_for)
+            self._timestamps.append(time.monotonic())
+
+
+class DeadEndpointCache:
+    """Remembers endpoints that 404ed or refused connections for `ttl` seconds."""
+
+    def __init__(self, ttl: float = 3600.0):
+        self.ttl = ttl
+        self._expiry: Dict[str, float] = {}
+
+    def __contains__(self, url: str) -> bool:
+        expiry = self._expiry.get(url)
+        if expiry is None:
+            return False
+        if time.monotonic() >= expiry:
+            del self._expiry[url]
+            return False
+        return True
+
+    def add(self, url: str):
+        self._expiry[url] = time.monotonic() + self.ttl
+
+
+def chunk_batch(items: List, max_batch: int) -> List[List]:
+    """Split a batch request payload into provider-sized chunks."""
+    return [items[i:i + max_batch] for i in range(0, len(items), max_batch)]
+
+
+@lru_cache(maxsize=16384)
+def _cached_parse_date(date_str: str) -> Optional[datetime]:
+    """Parse a date string once; repeated strings ('Jan 2024', ...) hit the cache.
+
+    The fixed default anchors missing fields (day 1, not today), so
+    partial dates parse deterministically and never fail on short months;
+    dayfirst keeps ambiguous dd-mm dates in this source's convention.
+    """
+    try:
+        return _dateutil_parse(date_str, dayfirst=True, default=datetime(1900, 1, 1))
+    except (ValueError, OverflowError):
+        return None
 
 
 class VahanDataCollector:
@@ -17,10 +130,71 @@ class VahanDataCollector:
 
     def __init__(self):
         self.base_url = "https://vahan.parivahan.gov.in"
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        # requests.Session is not guaranteed thread-safe, so every request
+        # goes through the calling thread's own session (created lazily);
+        # the main thread gets one the same way
+        self._thread_local = threading.local()
+
+        limits = PROVIDER_LIMITS['default']
+        self.rate_limiter = RateLimiter(calls=limits['rps'])
+        self.max_batch = limits['max_batch']
+
+        # Negative-result cache: endpoints that 404 or refuse connections
+        # are skipped for an hour instead of re-probed on every fetch.
+        # The collector is a cached singleton, so this survives reruns.
+        self.dead_endpoints = DeadEndpointCache()
+
+        # Opt-in: building the zero-filled placeholder frame is wasted work
+        # when no real data exists - charts render the same from an empty one
+        self.use_placeholder = False
+
+    def _make_session(self) -> requests.Session:
+        """Build a pooled session with retries: connections are kept alive
+        and reused across calls instead of paying a TCP/TLS handshake
+        each time."""
+        session = requests.Session()
+        session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Connection': 'keep-alive'
         })
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=50,
+            max_retries=Retry(total=3, backoff_factor=0.3,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _worker_session(self) -> requests.Session:
+        """The calling thread's own session, created on first use."""
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = self._thread_local.session = self._make_session()
+        return session
+
+    def _limited_get(self, **spec) -> requests.Response:
+        """GET through the calling thread's session, honoring the rate limiter."""
+        self.rate_limiter.acquire()
+        return self._worker_session().get(**spec)
+
+    def _get_many(self, request_specs: List[Dict], max_workers: int = 8) -> List[requests.Response]:
+        """Issue several GET requests concurrently, one session per worker.
+
+        Each spec is a dict of kwargs for ``session.get`` (url, params,
+        timeout, ...). Wall-clock cost becomes max(latency) instead of
+        sum(latency); failures are dropped.
+        """
+        responses = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self._limited_get, **spec) for spec in request_specs]
+            for future in as_completed(futures):
+                try:
+                    responses.append(future.result())
+                except Exception:
+                    continue
+        return responses
 
     def fetch_vehicle_data(self) -> pd.DataFrame:
         """Fetch vehicle registration data from Vahan Dashboard."""
@@ -35,12 +209,17 @@ class VahanDataCollector:
 
             return self._create_empty_dataframe()
 
-        except Exception as e:
-            st.error(f"Error in data collection: {str(e)}")
+        except Exception:
+            logger.exception("Error in data collection")
             return self._create_empty_dataframe()
 
     def _fetch_from_api(self) -> Optional[pd.DataFrame]:
-        """Attempt to fetch data from Vahan API endpoints."""
+        """Attempt to fetch data from Vahan API endpoints.
+
+        All endpoint/param probes are issued concurrently; the first
+        response that parses into a non-empty frame wins and the rest
+        are cancelled.
+        """
         try:
             api_endpoints = [
                 "/vahan/api/getVehicleData",
@@ -48,34 +227,71 @@ class VahanDataCollector:
                 "/dashboard/api/registration-data"
             ]
 
-            for endpoint in api_endpoints:
-                try:
-                    url = f"{self.base_url}{endpoint}"
+            params_list = [
+                {"state": "DL", "period": "monthly", "vehicle_type": "all"},
+                {"state": "all", "from_date": "2023-01-01", "to_date": "2024-12-31"},
+                {"type": "registration", "format": "json"}
+            ]
 
-                    params_list = [
-                        {"state": "DL", "period": "monthly", "vehicle_type": "all"},
-                        {"state": "all", "from_date": "2023-01-01", "to_date": "2024-12-31"},
-                        {"type": "registration", "format": "json"}
-                    ]
+            candidates = [
+                f"{self.base_url}{endpoint}"
+                for endpoint in api_endpoints
+                if f"{self.base_url}{endpoint}" not in self.dead_endpoints
+            ]
+            if not candidates:
+                return None
 
-                    for params in params_list:
-                        response = self.session.get(url, params=params, timeout=10)
+            # Cheap HEAD probe per endpoint before the full GET fan-out;
+            # dead ones go into the TTL cache and cost nothing until expiry
+            def _alive(url: str) -> bool:
+                try:
+                    return self._worker_session().head(url, timeout=2).status_code < 400
+                except requests.RequestException:
+                    return False
+
+            live_urls = []
+            with ThreadPoolExecutor(max_workers=len(candidates)) as executor:
+                for url, ok in zip(candidates, executor.map(_alive, candidates)):
+                    if ok:
+                        live_urls.append(url)
+                    else:
+                        self.dead_endpoints.add(url)
 
-                        if response.status_code == 200:
-                            data = response.json()
-                            df = self._parse_api_response(data)
-                            if df is not None and not df.empty:
-                                return df
+            if not live_urls:
+                return None
 
-                        time.sleep(1)
+            probes = [
+                (url, params)
+                for url in live_urls
+                for params in params_list
+            ]
 
-                except Exception:
-                    continue
+            with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+                futures = {
+                    executor.submit(self._limited_get, url=url, params=params, timeout=10): (url, params)
+                    for url, params in probes
+                }
+                for future in as_completed(futures):
+                    # Parsing stays inside the per-future guard: one 200
+                    # with malformed JSON must not abort the fan-out while
+                    # valid responses are still pending
+                    try:
+                        response = future.result()
+                        if response.status_code != 200:
+                            continue
+                        df = self._parse_api_response(response.json())
+                    except Exception:
+                        continue
+
+                    if df is not None and not df.empty:
+                        for pending in futures:
+                            pending.cancel()
+                        return df
 
             return None
 
         except Exception as e:
-            print(f"API fetch error: {str(e)}")
+            logger.warning("API fetch error: %s", e)
             return None
 
     def _fetch_from_web_scraping(self) -> Optional[pd.DataFrame]:
@@ -87,6 +303,11 @@ class VahanDataCollector:
                 f"{self.base_url}/vehicleservice/SearchRegistrationDetails.do"
             ]
 
+            # First url that parses into a non-empty frame wins: the
+            # targets are overlapping views of the same dashboard, so
+            # merging them would double-count registrations. (For truly
+            # disjoint sources, collect frames in a list and concat once
+            # after the loop - never concat inside it.)
             for url in target_urls:
                 try:
                     downloaded = trafilatura.fetch_url(url)
@@ -98,21 +319,27 @@ class VahanDataCollector:
                             if df is not None and not df.empty:
                                 return df
 
-                    time.sleep(2)
-
                 except Exception:
                     continue
 
-            return self._create_sample_data()
+            return self._fallback_dataframe()
 
         except Exception as e:
-            print(f"Web scraping error: {str(e)}")
+            logger.warning("Web scraping error: %s", e)
+            return self._fallback_dataframe()
+
+    def _fallback_dataframe(self) -> pd.DataFrame:
+        """Empty frame unless placeholder data was explicitly requested."""
+        if self.use_placeholder:
             return self._create_sample_data()
+        return self._create_empty_dataframe()
 
     def _parse_api_response(self, data: Dict) -> Optional[pd.DataFrame]:
         """Parse API response into DataFrame."""
         try:
-            records = []
+            # Columnar buffers: build the frame from four lists instead of
+            # a list of dicts, skipping per-row schema inference
+            dates, cats, mfrs, counts = [], [], [], []
 
             if isinstance(data, dict):
                 if 'data' in data:
@@ -127,63 +354,69 @@ class VahanDataCollector:
                     if isinstance(item, dict):
                         record = self._standardize_record(item)
                         if record:
-                            records.append(record)
-
-            if records:
-                df = pd.DataFrame(records)
+                            dates.append(record.get('date'))
+                            cats.append(record.get('vehicle_category'))
+                            mfrs.append(record.get('manufacturer'))
+                            counts.append(record.get('registrations'))
+
+            if dates:
+                df = pd.DataFrame({
+                    'date': dates,
+                    'vehicle_category': cats,
+                    'manufacturer': mfrs,
+                    'registrations': counts
+                })
                 return self._validate_and_clean_data(df)
 
             return None
 
         except Exception as e:
-            print(f"API parsing error: {str(e)}")
+            logger.warning("API parsing error: %s", e)
             return None
 
     def _parse_scraped_content(self, content: str, source_url: str) -> Optional[pd.DataFrame]:
         """Parse scraped text content."""
         try:
-            records = []
-            lines = content.split('\n')
-
-            patterns = {
-                'vehicle_count': r'(\d+)\s*(vehicles?|registrations?)',
-                'manufacturer': r'(Maruti|Honda|Hyundai|Tata|Mahindra|Toyota|Ford|Suzuki|Hero|Bajaj|TVS|Yamaha)',
-                'category': r'(2W|3W|4W|Two Wheeler|Three Wheeler|Four Wheeler|Car|Bike|Motorcycle)',
-                'date': r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
-                'month_year': r'(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s*(\d{4})'
-            }
-
-            current_record = {}
-
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-
-                for pattern_name, pattern in patterns.items():
-                    matches = re.findall(pattern, line, re.IGNORECASE)
-                    if matches:
-                        if pattern_name == 'vehicle_count':
-                            current_record['registrations'] = int(matches[0][0])
-                        elif pattern_name == 'manufacturer':
-                            current_record['manufacturer'] = matches[0]
-                        elif pattern_name == 'category':
-                            current_record['vehicle_category'] = self._standardize_category(matches[0])
-                        elif pattern_name in ['date', 'month_year']:
-                            current_record['date'] = self._parse_date(matches[0])
+            # Columnar buffers; the in-flight record stays a small dict but
+            # completed records land directly in per-column lists
+            dates, cats, mfrs, counts = [], [], [], []
+
+            # One pass of the precompiled alternation per line; a line is
+            # one record, so flushing happens at line boundaries and a
+            # four-field line can never bleed into the next record
+            for line in content.splitlines():
+                current_record = {}
+                for match in _SCRAPE_PATTERN.finditer(line):
+                    kind = match.lastgroup
+                    if kind == 'count':
+                        current_record.setdefault('registrations', int(match.group('count')))
+                    elif kind == 'manufacturer':
+                        current_record.setdefault('manufacturer', match.group('manufacturer'))
+                    elif kind == 'category':
+                        # Raw value; normalized in bulk by _validate_and_clean_data
+                        current_record.setdefault('vehicle_category', match.group('category'))
+                    else:  # date or month_year - parsed in bulk later
+                        current_record.setdefault('date', match.group(kind))
 
                 if len(current_record) >= 3:
-                    records.append(current_record.copy())
-                    current_record = {}
-
-            if records:
-                df = pd.DataFrame(records)
+                    dates.append(current_record.get('date'))
+                    cats.append(current_record.get('vehicle_category'))
+                    mfrs.append(current_record.get('manufacturer'))
+                    counts.append(current_record.get('registrations'))
+
+            if dates:
+                df = pd.DataFrame({
+                    'date': dates,
+                    'vehicle_category': cats,
+                    'manufacturer': mfrs,
+                    'registrations': counts
+                })
                 return self._validate_and_clean_data(df)
 
             return None
 
         except Exception as e:
-            print(f"Content parsing error: {str(e)}")
+            logger.warning("Content parsing error: %s", e)
             return None
 
     def _create_sample_data(self) -> pd.DataFrame:
@@ -201,25 +434,23 @@ class VahanDataCollector:
                 '4W': ['Maruti Suzuki', 'Hyundai', 'Tata Motors', 'Mahindra', 'Honda Cars', 'Toyota']
             }
 
-            records = []
-
-            for date in date_range:
-                for category in categories:
-                    for manufacturer in manufacturers[category]:
-                        record = {
-                            'date': date,
-                            'vehicle_category': category,
-                            'manufacturer': manufacturer,
-                            'registrations': 0,
-                            'data_source': 'placeholder'
-                        }
-                        records.append(record)
-
-            df = pd.DataFrame(records)
+            # Vectorized construction: cross the date range with the
+            # (category, manufacturer) pairs in one shot instead of
+            # building per-row dicts in nested loops
+            pairs = [(category, manufacturer)
+                     for category in categories
+                     for manufacturer in manufacturers[category]]
+            idx = pd.MultiIndex.from_product([date_range, pairs], names=['date', 'pair'])
+            df = idx.to_frame(index=False)
+            df[['vehicle_category', 'manufacturer']] = pd.DataFrame(
+                df.pop('pair').tolist(), index=df.index
+            )
+            df['registrations'] = 0
+            df['data_source'] = 'placeholder'
             return self._validate_and_clean_data(df)
 
         except Exception as e:
-            print(f"Sample data creation error: {str(e)}")
+            logger.warning("Sample data creation error: %s", e)
             return self._create_empty_dataframe()
 
     def _create_empty_dataframe(self) -> pd.DataFrame:
@@ -236,15 +467,12 @@ class VahanDataCollector:
                 'registrations': ['registrations', 'count', 'total', 'reg_count', 'vehicles']
             }
 
+            # Copy raw values only; category normalization and date parsing
+            # happen vectorized in _validate_and_clean_data
             for standard_field, possible_fields in field_mappings.items():
                 for field in possible_fields:
                     if field in record:
-                        if standard_field == 'vehicle_category':
-                            standardized[standard_field] = self._standardize_category(record[field])
-                        elif standard_field == 'date':
-                            standardized[standard_field] = self._parse_date(record[field])
-                        else:
-                            standardized[standard_field] = record[field]
+                        standardized[standard_field] = record[field]
                         break
 
             required_fields = ['date', 'vehicle_category', 'registrations']
@@ -254,41 +482,20 @@ class VahanDataCollector:
             return None
 
         except Exception as e:
-            print(f"Record standardization error: {str(e)}")
+            logger.warning("Record standardization error: %s", e)
             return None
 
     def _standardize_category(self, category: str) -> str:
         category = str(category).upper().strip()
-        if any(term in category for term in ['2W', 'TWO WHEEL', 'BIKE', 'MOTORCYCLE', 'SCOOTER']):
-            return '2W'
-        elif any(term in category for term in ['3W', 'THREE WHEEL', 'AUTO', 'RICKSHAW']):
-            return '3W'
-        elif any(term in category for term in ['4W', 'FOUR WHEEL', 'CAR', 'PASSENGER']):
-            return '4W'
-        else:
-            return category
+        for bucket, pattern in _CAT_PATTERNS:
+            if pattern.search(category):
+                return bucket
+        return category
 
     def _parse_date(self, date_str) -> Optional[datetime]:
-        try:
-            if isinstance(date_str, datetime):
-                return date_str
-
-            date_str = str(date_str)
-            formats = [
-                '%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y',
-                '%d/%m/%Y', '%Y/%m/%d', '%b %Y', '%B %Y'
-            ]
-
-            for fmt in formats:
-                try:
-                    return datetime.strptime(date_str, fmt)
-                except ValueError:
-                    continue
-
-            return None
-
-        except Exception:
-            return None
+        if isinstance(date_str, datetime):
+            return date_str
+        return _cached_parse_date(str(date_str))
 
     def _validate_and_clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         try:
@@ -306,20 +513,69 @@ class VahanDataCollector:
             if 'manufacturer' not in df.columns:
                 df['manufacturer'] = 'Unknown'
 
-            df['date'] = pd.to_datetime(df['date'], errors='coerce')
-            df['registrations'] = pd.to_numeric(df['registrations'], errors='coerce').fillna(0)
-
-            df = df.dropna(subset=['date'])
-            df = df.sort_values('date')
-            df = df.reset_index(drop=True)
+            # Vectorized normalization: one extract over the compiled token
+            # alternation plus a dict map, instead of three contains passes
+            df['vehicle_category'] = standardize_category_series(df['vehicle_category'])
+
+            # cache=True dedupes repeated date strings to one parse each.
+            # Ambiguous dd-mm-yyyy strings parse day-first per this
+            # source's convention; unambiguous ISO yyyy-mm-dd strings are
+            # split off first because dayfirst would flip them too
+            raw = df['date']
+            if raw.dtype == object or pd.api.types.is_string_dtype(raw):
+                s = raw.astype(str)
+                iso = s.str.match(r'\d{4}-\d{1,2}-\d{1,2}')
+                parsed = pd.to_datetime(s.where(~iso), errors='coerce', format='mixed',
+                                        dayfirst=True, cache=True)
+                df['date'] = parsed.fillna(
+                    pd.to_datetime(s.where(iso), errors='coerce', cache=True)
+                )
+            else:
+                df['date'] = pd.to_datetime(raw, errors='coerce')
+            df['registrations'] = pd.to_numeric(
+                df['registrations'], errors='coerce', downcast='unsigned'
+            ).fillna(0)
+
+            # Categorical codes shrink the repeated strings and speed every
+            # downstream groupby/filter over these columns
+            df['vehicle_category'] = df['vehicle_category'].astype('category')
+            df['manufacturer'] = df['manufacturer'].astype('category')
+            if 'data_source' in df.columns:
+                df['data_source'] = df['data_source'].astype('category')
+
+            # One notna mask replaces the dropna pass; stable mergesort is
+            # cheap on mostly-sorted dates and ignore_index fuses the sort
+            # with the reindex, so the whole tail is two allocations at most
+            df = df.loc[df['date'].notna()]
+            if not df['date'].is_monotonic_increasing:
+                df = df.sort_values('date', kind='mergesort', ignore_index=True)
+            else:
+                df = df.reset_index(drop=True)
 
             return df
 
         except Exception as e:
-            print(f"Data validation error: {str(e)}")
+            logger.warning("Data validation error: %s", e)
             return pd.DataFrame(columns=['date', 'vehicle_category', 'manufacturer', 'registrations'])
 
 
+@st.cache_resource
+def get_collector() -> 'VahanDataCollector':
+    """One collector per server: its session pool and TLS connections
+    survive across reruns instead of being rebuilt per widget tick."""
+    return VahanDataCollector()
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def load_vehicle_data() -> pd.DataFrame:
+    """Fetch vehicle data once per hour; reruns get the cached frame.
+
+    Caching lives on this free function rather than the method so
+    Streamlit never has to hash the collector instance itself.
+    """
+    return get_collector().fetch_vehicle_data()
+
+
 # ----------------------------------------------------------
 # Main Script: Run and save data to JSON
 # ----------------------------------------------------------
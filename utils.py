@@ -1,7 +1,26 @@
+import re
+
 import pandas as pd
 import numpy as np
 from typing import Union, Optional
 
+# Canonical manufacturer spellings, shared by the scalar and Series
+# cleaners; the alternation is compiled once at import
+_MANUFACTURER_REPLACEMENTS = {
+    'MARUTI SUZUKI': 'Maruti Suzuki',
+    'HERO MOTOCORP': 'Hero MotoCorp',
+    'HONDA MOTORCYCLE': 'Honda Motorcycle',
+    'BAJAJ AUTO': 'Bajaj Auto',
+    'TATA MOTORS': 'Tata Motors',
+    'MAHINDRA': 'Mahindra',
+    'HYUNDAI': 'Hyundai',
+    'TOYOTA': 'Toyota',
+    'TVS MOTOR': 'TVS Motor'
+}
+_MANUFACTURER_PATTERN = re.compile(
+    '(' + '|'.join(map(re.escape, _MANUFACTURER_REPLACEMENTS)) + ')'
+)
+
 def format_number(num: Union[int, float]) -> str:
     """
     Format large numbers for display with appropriate suffixes.
@@ -12,20 +31,46 @@ def format_number(num: Union[int, float]) -> str:
     Returns:
         Formatted string with K, M, B suffixes
     """
-    try:
-        num = float(num)
-        
-        if num >= 1_000_000_000:
-            return f"{num/1_000_000_000:.1f}B"
-        elif num >= 1_000_000:
-            return f"{num/1_000_000:.1f}M"
-        elif num >= 1_000:
-            return f"{num/1_000:.1f}K"
-        else:
-            return f"{int(num)}"
-    except (ValueError, TypeError):
+    # Fast path: small ints (KPI counts) need no float round-trip
+    if type(num) is int and -1000 < num < 1000:
+        return str(num)
+
+    # Aggregates can legitimately produce NaN; keep the original "0"
+    if pd.isna(num):
         return "0"
 
+    num = float(num)
+
+    if num >= 1_000_000_000:
+        return f"{num/1_000_000_000:.1f}B"
+    elif num >= 1_000_000:
+        return f"{num/1_000_000:.1f}M"
+    elif num >= 1_000:
+        return f"{num/1_000:.1f}K"
+    else:
+        return f"{int(num)}"
+
+def format_number_series(values: pd.Series) -> pd.Series:
+    """
+    Format a whole numeric column for display in one vectorized pass.
+
+    Args:
+        values: Series of numbers to format
+
+    Returns:
+        Series of formatted strings with K, M, B suffixes
+    """
+    v = pd.to_numeric(values, errors='coerce').fillna(0).to_numpy(dtype=float)
+    conditions = [v >= 1_000_000_000, v >= 1_000_000, v >= 1_000]
+    scaled = np.select(conditions, [v / 1e9, v / 1e6, v / 1e3], default=v)
+    suffix = np.select(conditions, ['B', 'M', 'K'], default='')
+    formatted = np.where(
+        suffix == '',
+        v.astype(np.int64).astype(str),
+        np.char.add(np.round(scaled, 1).astype(str), suffix)
+    )
+    return pd.Series(formatted, index=values.index)
+
 def calculate_growth(current: float, previous: float) -> float:
     """
     Calculate percentage growth between two values.
@@ -37,12 +82,11 @@ def calculate_growth(current: float, previous: float) -> float:
     Returns:
         Growth percentage
     """
-    try:
-        if previous == 0:
-            return 0.0
-        return ((current - previous) / previous) * 100
-    except (ValueError, TypeError, ZeroDivisionError):
+    # No defensive try/except: both operands are numeric at every call
+    # site, so the wrapper is a plain branch plus one division
+    if previous == 0:
         return 0.0
+    return ((current - previous) / previous) * 100
 
 def safe_divide(numerator: float, denominator: float, default: float = 0.0) -> float:
     """
@@ -56,12 +100,26 @@ def safe_divide(numerator: float, denominator: float, default: float = 0.0) -> f
     Returns:
         Division result or default
     """
-    try:
-        if denominator == 0:
-            return default
-        return numerator / denominator
-    except (ValueError, TypeError):
+    if denominator == 0:
         return default
+    return numerator / denominator
+
+def safe_divide_arr(numerator, denominator, default: float = 0.0) -> np.ndarray:
+    """
+    Vectorized safe division over arrays or Series.
+
+    Args:
+        numerator: Array-like of numerators
+        denominator: Array-like of denominators
+        default: Value used where the denominator is zero
+
+    Returns:
+        Array of division results with default where denominator is zero
+    """
+    num = np.asarray(numerator, dtype=np.float64)
+    den = np.asarray(denominator, dtype=np.float64)
+    zero = den == 0
+    return np.where(zero, default, num / np.where(zero, 1, den))
 
 def validate_dataframe(df: pd.DataFrame, required_columns: list) -> bool:
     """
@@ -118,6 +176,8 @@ def calculate_market_share(value: float, total: float) -> float:
     Returns:
         Market share percentage
     """
+    if isinstance(value, (np.ndarray, pd.Series)) or isinstance(total, (np.ndarray, pd.Series)):
+        return safe_divide_arr(value, total) * 100
     return safe_divide(value, total, 0.0) * 100
 
 def get_growth_color(growth: float) -> str:
@@ -168,30 +228,32 @@ def clean_manufacturer_name(name: str) -> str:
     """
     try:
         name = str(name).strip()
-        
-        # Common standardizations
-        replacements = {
-            'MARUTI SUZUKI': 'Maruti Suzuki',
-            'HERO MOTOCORP': 'Hero MotoCorp',
-            'HONDA MOTORCYCLE': 'Honda Motorcycle',
-            'BAJAJ AUTO': 'Bajaj Auto',
-            'TATA MOTORS': 'Tata Motors',
-            'MAHINDRA': 'Mahindra',
-            'HYUNDAI': 'Hyundai',
-            'TOYOTA': 'Toyota',
-            'TVS MOTOR': 'TVS Motor'
-        }
-        
-        name_upper = name.upper()
-        for key, value in replacements.items():
-            if key in name_upper:
-                return value
-        
+
+        # One scan of the precompiled alternation replaces nine
+        # substring tests; the matched key maps straight to its spelling
+        match = _MANUFACTURER_PATTERN.search(name.upper())
+        if match:
+            return _MANUFACTURER_REPLACEMENTS[match.group(1)]
+
         # Title case for other names
         return name.title()
     except:
         return str(name)
 
+def clean_manufacturer_series(s: pd.Series) -> pd.Series:
+    """
+    Clean and standardize a whole manufacturer column in one pass.
+
+    Args:
+        s: Series of raw manufacturer names
+
+    Returns:
+        Series of cleaned manufacturer names
+    """
+    upper = s.astype(str).str.strip().str.upper()
+    canonical = upper.str.extract(_MANUFACTURER_PATTERN, expand=False).map(_MANUFACTURER_REPLACEMENTS)
+    return canonical.fillna(upper.str.title())
+
 def calculate_compound_growth_rate(start_value: float, end_value: float, periods: int) -> float:
     """
     Calculate compound annual growth rate (CAGR).
@@ -224,10 +286,7 @@ def format_percentage(value: float, decimals: int = 1) -> str:
     Returns:
         Formatted percentage string
     """
-    try:
-        return f"{value:.{decimals}f}%"
-    except:
-        return "0.0%"
+    return f"{value:.{decimals}f}%"
 
 def get_quarter_from_date(date) -> str:
     """
@@ -247,6 +306,18 @@ def get_quarter_from_date(date) -> str:
     except:
         return "Unknown"
 
+def quarter_series(dates: pd.Series) -> pd.Series:
+    """
+    Get quarter strings for a whole datetime column at once.
+
+    Args:
+        dates: Series of datetime64 values
+
+    Returns:
+        Series of quarter strings (e.g., "2024-Q1")
+    """
+    return dates.dt.year.astype(str) + '-Q' + dates.dt.quarter.astype(str)
+
 def calculate_moving_average(series: pd.Series, window: int = 3) -> pd.Series:
     """
     Calculate moving average for a series.
@@ -259,7 +330,18 @@ def calculate_moving_average(series: pd.Series, window: int = 3) -> pd.Series:
         Moving average series
     """
     try:
-        return series.rolling(window=window, min_periods=1).mean()
+        # Rolling-sum accumulator: one cumsum plus one subtraction gives
+        # every window mean in O(N) regardless of window size, without
+        # pandas' per-window rolling machinery
+        x = series.to_numpy(dtype=float)
+        if np.isnan(x).any():
+            return series.rolling(window=window, min_periods=1).mean()
+        c = np.cumsum(x)
+        out = np.empty_like(x)
+        head = min(window, len(x))
+        out[:head] = c[:head] / np.arange(1, head + 1)
+        out[window:] = (c[window:] - c[:-window]) / window
+        return pd.Series(out, index=series.index)
     except:
         return series
 
@@ -275,7 +357,10 @@ def detect_outliers(series: pd.Series, threshold: float = 2.0) -> pd.Series:
         Boolean series indicating outliers
     """
     try:
-        z_scores = np.abs((series - series.mean()) / series.std())
-        return z_scores > threshold
+        # Work on the raw ndarray and compare against a pre-scaled bound:
+        # no per-element division and no intermediate Series allocations
+        x = series.to_numpy(dtype=float)
+        bound = threshold * np.nanstd(x, ddof=1)
+        return pd.Series(np.abs(x - np.nanmean(x)) > bound, index=series.index)
     except:
         return pd.Series([False] * len(series))